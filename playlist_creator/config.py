@@ -5,30 +5,44 @@ Handles environment variables and configuration settings.
 """
 
 import os
+from functools import lru_cache
 from pathlib import Path
 
+
+def _find_env_path() -> Path | None:
+    """
+    Locate the .env file, preferring the current directory over the project root.
+
+    Returns:
+        Path: Path to the first .env file found, or None if there is none
+    """
+    for env_path in (Path(".env"), Path(__file__).parent.parent / ".env"):
+        if env_path.exists():
+            return env_path
+    return None
+
+
+# Resolved once at import; the .env location does not change during a run
+_ENV_PATH = _find_env_path()
+
 try:
     from dotenv import load_dotenv
 
-    # Try to load .env file from current directory or project root
-    env_path = Path(".env")
-    if env_path.exists():
-        load_dotenv(env_path)
-    else:
-        # Try project root
-        project_root = Path(__file__).parent.parent
-        env_path = project_root / ".env"
-        if env_path.exists():
-            load_dotenv(env_path)
+    if _ENV_PATH is not None:
+        load_dotenv(_ENV_PATH)
 except ImportError:
     # python-dotenv not installed, skip
     pass
 
 
+@lru_cache(maxsize=1)
 def get_spotify_credentials() -> tuple[str | None, str | None]:
     """
     Get Spotify credentials from environment variables.
 
+    The result is cached for the lifetime of the process; call
+    ``get_spotify_credentials.cache_clear()`` after changing the environment.
+
     Returns:
         tuple: (client_id, client_secret) or (None, None) if not found
     """
@@ -10,69 +10,136 @@ to get your CLIENT_ID and CLIENT_SECRET.
 """
 
 import argparse
+import json
 import os
 import re
 import sys
+import threading
 import time
 import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
 
 import requests
 import spotipy
+from requests.adapters import HTTPAdapter
 from spotipy.oauth2 import SpotifyClientCredentials
+from urllib3.util import Retry
 
 from .config import (
     get_config_instructions,
     get_spotify_credentials,
     validate_credentials,
 )
+from .utils import make_safe_name, save_file
+
+# Spotify Web API endpoint used for raw playlist track requests
+SPOTIFY_API_BASE = "https://api.spotify.com/v1"
+
+# Spotify returns at most 100 playlist items per page
+SPOTIFY_PAGE_SIZE = 100
+
+# Number of Spotify playlist pages fetched at once
+SPOTIFY_PAGE_WORKERS = 5
+
+# Number of YouTube searches allowed in flight at once
+YOUTUBE_SEARCH_WORKERS = 8
+
+# Steady-state YouTube request rate, shared by all workers
+YOUTUBE_REQUESTS_PER_SECOND = 4
+
+# Translation table escaping markdown special characters in a single pass
+_MD_ESCAPE = str.maketrans({c: f"\\{c}" for c in "*_`[]()#+-.!"})
+
+# YouTube search results page; append a quote_plus-encoded query
+_YT_SEARCH_BASE = "https://www.youtube.com/results?search_query="
+
+# Spotify playlist URL/URI formats and bare playlist IDs
+_PLAYLIST_URL_RES = [
+    re.compile(r"playlist/([a-zA-Z0-9]+)"),
+    re.compile(r"spotify:playlist:([a-zA-Z0-9]+)"),
+]
+_ID_ONLY_RE = re.compile(r"^[a-zA-Z0-9]+$")
+
+# YouTube video IDs are 11 characters long and alphanumeric with - and _
+_VIDEO_ID_RE = re.compile(r'"videoId":"([a-zA-Z0-9_-]{11})"')
+
+# Chunk size for streaming YouTube result pages, and how many trailing
+# characters to carry between chunks so a split match is still found
+_SEARCH_CHUNK_SIZE = 32768
+_VIDEO_ID_CARRY = len('"videoId":"') + 11
+
+# Characters stripped from search queries
+_SANITIZE_RE = re.compile(r"[^\w\s-]")
+
+# Video URLs found during this run, keyed by encoded search query
+_video_url_cache = {}
+
+# Video URLs found in earlier runs, keyed by Spotify track ID
+YOUTUBE_CACHE_PATH = Path("output") / ".yt_cache.json"
 
 
 def setup_spotify_client(client_id, client_secret):
-    """Initialize and return Spotify client."""
+    """Initialize and return Spotify client and a bearer token for raw API calls."""
     try:
         credentials = SpotifyClientCredentials(
             client_id=client_id, client_secret=client_secret
         )
         sp = spotipy.Spotify(client_credentials_manager=credentials)
-        return sp
+        token = credentials.get_access_token(as_dict=False)
+        return sp, token
     except Exception as e:
         print(f"Error setting up Spotify client: {e}")
-        return None
+        return None, None
 
 
 def extract_playlist_id(url):
     """Extract playlist ID from Spotify URL."""
     # Handle different URL formats
-    patterns = [r"playlist/([a-zA-Z0-9]+)", r"spotify:playlist:([a-zA-Z0-9]+)"]
-
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _PLAYLIST_URL_RES:
+        match = pattern.search(url)
         if match:
             return match.group(1)
 
     # If it's already just an ID
-    if re.match(r"^[a-zA-Z0-9]+$", url):
+    if _ID_ONLY_RE.match(url):
         return url
 
     return None
 
 
-def get_playlist_data(sp, playlist_id):
+def get_playlist_data(sp, playlist_id, token):
     """Fetch playlist data from Spotify API."""
     try:
         # Get playlist info
         playlist = sp.playlist(playlist_id)
 
-        # Get all tracks (handle pagination)
-        tracks = []
-        results = sp.playlist_tracks(playlist_id)
-        tracks.extend(results["items"])
+        # Track pages are fetched directly with the bearer token, skipping
+        # spotipy's per-call wrapping
+        tracks_url = f"{SPOTIFY_API_BASE}/playlists/{playlist_id}/tracks"
+
+        with create_http_session() as session:
+            session.headers["Authorization"] = f"Bearer {token}"
+
+            def fetch_page(offset):
+                response = session.get(
+                    tracks_url,
+                    params={"limit": SPOTIFY_PAGE_SIZE, "offset": offset},
+                    timeout=10,
+                )
+                response.raise_for_status()
+                return response.json()
 
-        while results["next"]:
-            results = sp.next(results)
-            tracks.extend(results["items"])
+            # Get all tracks; the first page tells us how many pages remain
+            results = fetch_page(0)
+            tracks = list(results["items"])
+
+            # Fetch the remaining pages concurrently, keeping them in offset order
+            offsets = range(SPOTIFY_PAGE_SIZE, results["total"], SPOTIFY_PAGE_SIZE)
+            with ThreadPoolExecutor(max_workers=SPOTIFY_PAGE_WORKERS) as executor:
+                for page in executor.map(fetch_page, offsets):
+                    tracks.extend(page["items"])
 
         return playlist, tracks
 
@@ -84,6 +151,9 @@ def get_playlist_data(sp, playlist_id):
         else:
             print(f"Spotify API error: {e}")
         return None, None
+    except requests.exceptions.RequestException as e:
+        print(f"Spotify API error: {e}")
+        return None, None
     except Exception as e:
         print(f"Error fetching playlist data: {e}")
         return None, None
@@ -102,10 +172,7 @@ def clean_text(text):
     if not text:
         return ""
     # Escape markdown special characters
-    special_chars = ["*", "_", "`", "[", "]", "(", ")", "#", "+", "-", ".", "!"]
-    for char in special_chars:
-        text = text.replace(char, f"\\{char}")
-    return text
+    return text.translate(_MD_ESCAPE)
 
 
 def generate_markdown(playlist, tracks):
@@ -120,84 +187,93 @@ def generate_markdown(playlist, tracks):
     print(f"Generating markdown for playlist with {total_tracks} tracks...")
     print("Searching YouTube for track links (this may take a moment)...")
 
-    # Calculate total duration
-    total_duration_ms = sum(
-        track["track"]["duration_ms"]
-        for track in tracks
-        if track["track"] and track["track"]["duration_ms"]
-    )
+    # Format each track once, collecting search queries and the total
+    # duration in the same pass
+    entries = []
+    available = []
+    search_queries = []
+    total_duration_ms = 0
+    for item in tracks:
+        track = item["track"]
+
+        if not track:  # Handle None tracks (deleted/unavailable)
+            entries.append(None)
+            continue
+
+        duration_ms = track["duration_ms"]
+        if duration_ms:
+            total_duration_ms += duration_ms
+
+        track_name = clean_text(track["name"])
+        artists = ", ".join(clean_text(artist["name"]) for artist in track["artists"])
+
+        entries.append((track, track_name, artists))
+        available.append(track)
+        search_queries.append(f"{artists} {track_name}")
+
     total_duration = format_duration(total_duration_ms)
 
-    markdown = f"""# {playlist_name}
+    parts = [f"""# {playlist_name}
 
 **Created by:** {owner}
 **Total tracks:** {total_tracks}
 **Total duration:** {total_duration}
 **Generated on:** {datetime.now().strftime('%B %d, %Y')}
 
-"""
+"""]
 
     if description:
-        markdown += f"**Description:** {description}\n\n"
+        parts.append(f"**Description:** {description}\n\n")
 
-    markdown += "---\n\n## Tracks\n\n"
+    parts.append("---\n\n## Tracks\n\n")
+
+    # Search YouTube for every available track up front, concurrently
+    youtube_urls = iter(find_youtube_urls(available, search_queries))
 
     # Track list
     youtube_found_count = 0
-    for i, item in enumerate(tracks, 1):
-        track = item["track"]
-
-        if not track:  # Handle None tracks (deleted/unavailable)
-            markdown += f"{i}. *[Track unavailable]*\n"
+    for i, entry in enumerate(entries, 1):
+        if entry is None:
+            parts.append(f"{i}. *[Track unavailable]*\n")
             continue
 
-        track_name = clean_text(track["name"])
-        artists = ", ".join([clean_text(artist["name"]) for artist in track["artists"]])
+        track, track_name, artists = entry
         album = clean_text(track["album"]["name"])
         duration = format_duration(track["duration_ms"])
-
-        print(f"Processing {i}/{total_tracks}: {artists} - {track_name}")
+        spotify_url = track["external_urls"].get("spotify")
 
         # Add track with basic info
-        markdown += f"{i}. **{track_name}** by {artists}\n"
-        markdown += f"   - Album: *{album}*\n"
-        markdown += f"   - Duration: {duration}\n"
-
-        # Try to find YouTube link first, fall back to Spotify
-        search_query = f"{artists} {track_name}"
-        youtube_url = search_youtube(search_query)
-        
+        parts.append(f"{i}. **{track_name}** by {artists}\n")
+        parts.append(f"   - Album: *{album}*\n")
+        parts.append(f"   - Duration: {duration}\n")
+
+        # Use the YouTube link if one was found, fall back to Spotify
+        youtube_url = next(youtube_urls)
+
         if youtube_url and "watch?v=" in youtube_url:
             # Found a direct YouTube video link
-            markdown += f"   - [Listen on YouTube]({youtube_url})\n"
+            parts.append(f"   - [Listen on YouTube]({youtube_url})\n")
             youtube_found_count += 1
             # Add Spotify as backup
-            if track["external_urls"].get("spotify"):
-                markdown += (
-                    f"   - [Backup: Listen on Spotify]({track['external_urls']['spotify']})\n"
-                )
+            if spotify_url:
+                parts.append(f"   - [Backup: Listen on Spotify]({spotify_url})\n")
         else:
             # YouTube search failed, use Spotify as primary
-            if track["external_urls"].get("spotify"):
-                markdown += (
-                    f"   - [Listen on Spotify]({track['external_urls']['spotify']})\n"
-                )
+            if spotify_url:
+                parts.append(f"   - [Listen on Spotify]({spotify_url})\n")
 
-        markdown += "\n"
-        
-        # Small delay to be respectful to YouTube
-        time.sleep(0.5)
+        parts.append("\n")
 
     print(f"Found YouTube links for {youtube_found_count}/{total_tracks} tracks")
 
-    markdown += "---\n\n"
-    markdown += "*Generated using Spotify Web API with YouTube link integration*\n\n"
+    parts.append("---\n\n")
+    parts.append("*Generated using Spotify Web API with YouTube link integration*\n\n")
     
     # Add original Spotify playlist link
     if playlist.get("external_urls", {}).get("spotify"):
-        markdown += f"**Original Spotify Playlist:** [Listen on Spotify]({playlist['external_urls']['spotify']})\n"
+        parts.append(f"**Original Spotify Playlist:** [Listen on Spotify]({playlist['external_urls']['spotify']})\n")
 
-    return markdown
+    return "".join(parts)
 
 
 def generate_m3u(playlist, tracks):
@@ -206,8 +282,8 @@ def generate_m3u(playlist, tracks):
     playlist_name = playlist["name"]
 
     # M3U header
-    m3u_content = "#EXTM3U\n"
-    m3u_content += f"#PLAYLIST:{playlist_name}\n\n"
+    parts = ["#EXTM3U\n"]
+    parts.append(f"#PLAYLIST:{playlist_name}\n\n")
 
     for item in tracks:
         track = item["track"]
@@ -220,58 +296,201 @@ def generate_m3u(playlist, tracks):
         duration_seconds = track["duration_ms"] // 1000
 
         # Add extended info line
-        m3u_content += f"#EXTINF:{duration_seconds},{artists} - {track_name}\n"
+        parts.append(f"#EXTINF:{duration_seconds},{artists} - {track_name}\n")
 
         # Add Spotify URL (most M3U players can handle Spotify URLs)
         if track["external_urls"].get("spotify"):
-            m3u_content += f"{track['external_urls']['spotify']}\n"
+            parts.append(f"{track['external_urls']['spotify']}\n")
         else:
             # Fallback: create a search URL or comment
             search_query = f"{artists} {track_name}".replace(" ", "%20")
-            m3u_content += f"# Search: https://open.spotify.com/search/{search_query}\n"
+            parts.append(f"# Search: https://open.spotify.com/search/{search_query}\n")
 
-        m3u_content += "\n"
+        parts.append("\n")
 
-    return m3u_content
+    return "".join(parts)
 
 
-def search_youtube(query, max_retries=3):
-    """Search for a track on YouTube and return the first video URL."""
-
-    # Clean and encode the search query
-    clean_query = re.sub(r"[^\w\s-]", "", query).strip()
-    encoded_query = urllib.parse.quote_plus(clean_query)
+def create_http_session():
+    """
+    Create a requests session with a connection pool sized for the workers
+    and automatic retries with backoff for transient failures.
+    """
+    session = requests.Session()
+    retries = Retry(
+        total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504)
+    )
+    adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16, max_retries=retries)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
 
-    # YouTube search URL (we'll scrape the results page)
-    search_url = f"https://www.youtube.com/results?search_query={encoded_query}"
 
-    headers = {
+# Shared session for YouTube searches; keep-alive reuses the TCP/TLS connection
+_SESSION = create_http_session()
+_SESSION.headers.update(
+    {
         "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
     }
+)
 
-    for attempt in range(max_retries):
-        try:
-            response = requests.get(search_url, headers=headers, timeout=10)
-            response.raise_for_status()
 
-            # Look for video IDs in the response
-            # YouTube video IDs are 11 characters long and alphanumeric with - and _
-            video_id_pattern = r'"videoId":"([a-zA-Z0-9_-]{11})"'
-            matches = re.findall(video_id_pattern, response.text)
+class RateLimiter:
+    """Thread-safe limiter spacing calls evenly at a given rate per second."""
 
-            if matches:
-                # Return the first video URL
-                video_id = matches[0]
-                return f"https://www.youtube.com/watch?v={video_id}"
+    def __init__(self, rate_per_second):
+        self._interval = 1 / rate_per_second
+        self._next = 0.0
+        self._lock = threading.Lock()
 
-        except requests.exceptions.RequestException as e:
-            print(f"Attempt {attempt + 1} failed for '{query}': {e}")
-            if attempt < max_retries - 1:
-                time.sleep(2)  # Wait before retrying
-            continue
+    def acquire(self):
+        """Block only as long as needed to stay within the rate."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self._interval
+        # Sleep outside the lock so other threads can reserve later slots
+        if start > now:
+            time.sleep(start - now)
+
+
+_youtube_rate_limiter = RateLimiter(YOUTUBE_REQUESTS_PER_SECOND)
+
+
+def _find_first_video_id(response):
+    """Scan a streamed response for the first video ID, reading no further."""
+    if response.encoding is None:
+        response.encoding = "utf-8"
+
+    tail = ""
+    for chunk in response.iter_content(
+        chunk_size=_SEARCH_CHUNK_SIZE, decode_unicode=True
+    ):
+        window = tail + chunk
+        match = _VIDEO_ID_RE.search(window)
+        if match:
+            return match.group(1)
+        tail = window[-_VIDEO_ID_CARRY:]
+
+    return None
+
+
+def _encode_query(query):
+    """Clean and URL-encode a YouTube search query."""
+    return urllib.parse.quote_plus(_SANITIZE_RE.sub("", query).strip())
+
+
+def search_youtube(query):
+    """Search for a track on YouTube and return the first video URL."""
+
+    # Clean and encode the search query
+    encoded_query = _encode_query(query)
+
+    # Repeated tracks resolve without touching the network
+    cached_url = _video_url_cache.get(encoded_query)
+    if cached_url:
+        return cached_url
 
-    # If all attempts fail, return a search URL that users can manually check
-    return f"https://www.youtube.com/results?search_query={encoded_query}"
+    # YouTube search URL (we'll scrape the results page)
+    search_url = f"{_YT_SEARCH_BASE}{encoded_query}"
+
+    try:
+        _youtube_rate_limiter.acquire()
+        # Transient failures are retried by the session's adapter
+        with _SESSION.get(search_url, timeout=10, stream=True) as response:
+            response.raise_for_status()
+
+            # Stop scanning at the first video ID, then drain the rest of the
+            # body so the connection goes back to the pool instead of closing
+            # (a page without a match has already been read to the end)
+            video_id = _find_first_video_id(response)
+            if video_id:
+                for _ in response.iter_content(chunk_size=_SEARCH_CHUNK_SIZE):
+                    pass
+
+        if video_id:
+            # Return the first video URL
+            video_url = f"https://www.youtube.com/watch?v={video_id}"
+            _video_url_cache[encoded_query] = video_url
+            return video_url
+
+    except requests.exceptions.RequestException:
+        pass
+
+    # If the search fails, return a search URL that users can manually check
+    return search_url
+
+
+def search_youtube_many(queries):
+    """Search YouTube for several queries concurrently, preserving their order."""
+    # Search each distinct query once, then fan the results back out
+    keys = [_encode_query(query) for query in queries]
+    unique = dict(zip(keys, queries, strict=True))
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=YOUTUBE_SEARCH_WORKERS) as executor:
+        futures = {
+            executor.submit(search_youtube, query): key
+            for key, query in unique.items()
+        }
+        # Report progress as searches finish, whatever order they finish in
+        for done, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            results[key] = future.result()
+            print(f"Searched {done}/{len(futures)}: {unique[key]}")
+
+    return [results[key] for key in keys]
+
+
+def _load_yt_cache():
+    """Load the persistent YouTube URL cache, or an empty one if unavailable."""
+    try:
+        with open(YOUTUBE_CACHE_PATH, encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        print(f"Ignoring unreadable YouTube cache {YOUTUBE_CACHE_PATH}: {e}")
+        return {}
+    return cache if isinstance(cache, dict) else {}
+
+
+def _save_yt_cache(cache):
+    """Atomically write the persistent YouTube URL cache."""
+    tmp_path = YOUTUBE_CACHE_PATH.with_name(YOUTUBE_CACHE_PATH.name + ".tmp")
+    try:
+        YOUTUBE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, YOUTUBE_CACHE_PATH)
+    except OSError as e:
+        print(f"Error saving YouTube cache {YOUTUBE_CACHE_PATH}: {e}")
+
+
+def find_youtube_urls(tracks, queries):
+    """
+    Return a YouTube URL for each track, searching only for tracks that are
+    not already in the persistent cache.
+    """
+    cache = _load_yt_cache()
+    keys = [
+        track.get("id") or query
+        for track, query in zip(tracks, queries, strict=True)
+    ]
+    urls = [cache.get(key) for key in keys]
+
+    misses = [i for i, url in enumerate(urls) if not url]
+    if not misses:
+        return urls
+
+    results = search_youtube_many([queries[i] for i in misses])
+    for i, url in zip(misses, results, strict=True):
+        urls[i] = url
+        if "watch?v=" in url:
+            cache[keys[i]] = url
+
+    _save_yt_cache(cache)
+    return urls
 
 
 def generate_youtube_m3u(playlist, tracks, include_search_fallback=True):
@@ -280,17 +499,25 @@ def generate_youtube_m3u(playlist, tracks, include_search_fallback=True):
     playlist_name = playlist["name"]
 
     # M3U header
-    m3u_content = "#EXTM3U\n"
-    m3u_content += f"#PLAYLIST:{playlist_name}\n"
-    m3u_content += "# YouTube playlist generated from Spotify - playable in VLC\n"
-    m3u_content += f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n"
+    parts = ["#EXTM3U\n"]
+    parts.append(f"#PLAYLIST:{playlist_name}\n")
+    parts.append("# YouTube playlist generated from Spotify - playable in VLC\n")
+    parts.append(f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n")
 
     total_tracks = len([t for t in tracks if t["track"]])
     print(f"Searching YouTube for {total_tracks} tracks...")
 
+    # Search YouTube for every available track up front, concurrently
+    available = [item["track"] for item in tracks if item["track"]]
+    search_queries = [
+        f"{', '.join(artist['name'] for artist in track['artists'])} {track['name']}"
+        for track in available
+    ]
+    youtube_urls = iter(find_youtube_urls(available, search_queries))
+
     found_count = 0
 
-    for i, item in enumerate(tracks, 1):
+    for item in tracks:
         track = item["track"]
 
         if not track:  # Handle None tracks (deleted/unavailable)
@@ -300,36 +527,27 @@ def generate_youtube_m3u(playlist, tracks, include_search_fallback=True):
         artists = ", ".join([artist["name"] for artist in track["artists"]])
         duration_seconds = track["duration_ms"] // 1000
 
-        # Create search query
-        search_query = f"{artists} {track_name}"
-
-        print(f"Searching {i}/{total_tracks}: {search_query}")
-
-        # Search YouTube
-        youtube_url = search_youtube(search_query)
+        youtube_url = next(youtube_urls)
 
         # Add extended info line
-        m3u_content += f"#EXTINF:{duration_seconds},{artists} - {track_name}\n"
+        parts.append(f"#EXTINF:{duration_seconds},{artists} - {track_name}\n")
 
         # Check if we got a direct video URL or a search URL
         if "watch?v=" in youtube_url:
-            m3u_content += f"{youtube_url}\n"
+            parts.append(f"{youtube_url}\n")
             found_count += 1
         else:
             # Fallback: add as comment if requested
             if include_search_fallback:
-                m3u_content += f"# Search: {youtube_url}\n"
+                parts.append(f"# Search: {youtube_url}\n")
             else:
-                m3u_content += "# Not found on YouTube\n"
-
-        m3u_content += "\n"
+                parts.append("# Not found on YouTube\n")
 
-        # Small delay to be respectful to YouTube
-        time.sleep(0.5)
+        parts.append("\n")
 
     print(f"Found direct YouTube links for {found_count}/{total_tracks} tracks")
 
-    return m3u_content
+    return "".join(parts)
 
 
 def generate_youtube_m3u_fast(playlist, tracks):
@@ -338,12 +556,12 @@ def generate_youtube_m3u_fast(playlist, tracks):
     playlist_name = playlist["name"]
 
     # M3U header
-    m3u_content = "#EXTM3U\n"
-    m3u_content += f"#PLAYLIST:{playlist_name}\n"
-    m3u_content += (
+    parts = ["#EXTM3U\n"]
+    parts.append(f"#PLAYLIST:{playlist_name}\n")
+    parts.append(
         "# YouTube search playlist - manually verify URLs for best results\n"
     )
-    m3u_content += f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n"
+    parts.append(f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n")
 
     for item in tracks:
         track = item["track"]
@@ -354,41 +572,20 @@ def generate_youtube_m3u_fast(playlist, tracks):
         track_name = track["name"]
         artists = ", ".join([artist["name"] for artist in track["artists"]])
         duration_seconds = track["duration_ms"] // 1000
+        spotify_url = track["external_urls"].get("spotify", "N/A")
 
         # Create search query
-        search_query = f"{artists} {track_name}"
-        encoded_query = urllib.parse.quote_plus(search_query)
-
-        # Add extended info line
-        m3u_content += f"#EXTINF:{duration_seconds},{artists} - {track_name}\n"
-
-        # Add YouTube search URL
-        youtube_search_url = (
-            f"https://www.youtube.com/results?search_query={encoded_query}"
+        encoded_query = urllib.parse.quote_plus(f"{artists} {track_name}")
+
+        # Add extended info line, YouTube search URL and Spotify link
+        parts.append(
+            f"#EXTINF:{duration_seconds},{artists} - {track_name}\n"
+            f"# Manual search needed: {_YT_SEARCH_BASE}{encoded_query}\n"
+            f"# Spotify: {spotify_url}\n"
+            "\n"
         )
-        m3u_content += f"# Manual search needed: {youtube_search_url}\n"
-        m3u_content += f"# Spotify: {track['external_urls'].get('spotify', 'N/A')}\n"
-        m3u_content += "\n"
-
-    return m3u_content
 
-
-def save_file(content, filename, output_dir="output"):
-    """Save content to file in organized directory structure."""
-    try:
-        # Create output directory if it doesn't exist
-        os.makedirs(output_dir, exist_ok=True)
-        
-        # Create full file path
-        file_path = os.path.join(output_dir, filename)
-        
-        with open(file_path, "w", encoding="utf-8") as f:
-            f.write(content)
-        print(f"File saved: {file_path}")
-        return True
-    except Exception as e:
-        print(f"Error saving file {file_path}: {e}")
-        return False
+    return "".join(parts)
 
 
 def main():
@@ -412,7 +609,7 @@ def main():
         return False
 
     # Setup Spotify client
-    sp = setup_spotify_client(client_id, client_secret)
+    sp, token = setup_spotify_client(client_id, client_secret)
     if not sp:
         return False
 
@@ -431,7 +628,7 @@ def main():
     print(f"Fetching playlist data for ID: {playlist_id}")
 
     # Get playlist data
-    playlist, tracks = get_playlist_data(sp, playlist_id)
+    playlist, tracks = get_playlist_data(sp, playlist_id, token)
     if not playlist:
         return False
 
@@ -452,8 +649,7 @@ def main():
         choice = input("Enter choice (1-5): ").strip()
 
     # Create safe filename base and output directory
-    safe_name = re.sub(r"[^\w\s-]", "", playlist["name"]).strip()
-    safe_name = re.sub(r"[-\s]+", "-", safe_name)
+    safe_name = make_safe_name(playlist["name"])
     
     # Create output directory structure: output/playlist-name/
     output_dir = os.path.join("output", safe_name)
@@ -17,93 +17,97 @@ import argparse
 from pathlib import Path
 from datetime import datetime
 
+from .utils import make_safe_name, save_file
+
+# Single pattern matching, in one scan, the three kinds of markdown entries:
+#   track: 1. **Track Name** by Artist
+#   dur:   Duration: MM:SS
+#   yt:    [Listen on YouTube](https://www.youtube.com/watch?v=VIDEO_ID)
+# Whitespace is limited to [^\S\n] so no alternative spans more than one line.
+_ENTRY_RE = re.compile(
+    r'(?P<track>(?P<number>\d+)\.[^\S\n]*\*\*(?P<name>.+?)\*\*[^\S\n]*by[^\S\n]*(?P<artist>.+?)$)'
+    r'|(?P<dur>Duration:[^\S\n]*(?P<minutes>\d+):(?P<seconds>\d+))'
+    r'|(?P<yt>\[.*?Listen on YouTube.*?\]\((?P<url>https://www\.youtube\.com/watch\?v=[\w-]+)\))',
+    re.MULTILINE,
+)
+
+# Pattern to match the first h1 header
+_HEADER_RE = re.compile(r'^#\s+(.+?)$', re.MULTILINE)
+
+# Characters removed from playlist names (keeps basic punctuation)
+_NAME_CLEANUP_RE = re.compile(r'[^\w\s\-\(\)&\.,]')
+
 
 def extract_youtube_links_from_markdown(markdown_content):
     """Extract YouTube links and track information from markdown content."""
     tracks = []
-    
-    # Pattern to match track entries with YouTube links
-    # Matches: 1. **Track Name** by Artist
-    track_pattern = r'(\d+)\.\s*\*\*(.+?)\*\*\s*by\s*(.+?)(?:\n|$)'
-    
-    # Pattern to match YouTube links
-    youtube_pattern = r'\[.*?Listen on YouTube.*?\]\((https://www\.youtube\.com/watch\?v=[\w-]+)\)'
-    
-    # Pattern to match duration
-    duration_pattern = r'Duration:\s*(\d+):(\d+)'
-    
-    lines = markdown_content.split('\n')
     current_track = None
     
-    for line in lines:
+    for match in _ENTRY_RE.finditer(markdown_content):
+        kind = match.lastgroup
+        
         # Check for track header
-        track_match = re.search(track_pattern, line)
-        if track_match:
-            track_num = track_match.group(1)
-            track_name = track_match.group(2).replace('\\', '')  # Remove escape characters
-            artist = track_match.group(3).replace('\\', '')  # Remove escape characters
-            
+        if kind == 'track':
             current_track = {
-                'number': int(track_num),
-                'name': track_name,
-                'artist': artist,
+                'number': int(match.group('number')),
+                'name': match.group('name').replace('\\', ''),  # Remove escape characters
+                'artist': match.group('artist').replace('\\', ''),  # Remove escape characters
                 'duration_seconds': 0,
                 'youtube_url': None
             }
             continue
         
+        if not current_track:
+            continue
+        
         # Check for duration
-        if current_track:
-            duration_match = re.search(duration_pattern, line)
-            if duration_match:
-                minutes = int(duration_match.group(1))
-                seconds = int(duration_match.group(2))
-                current_track['duration_seconds'] = (minutes * 60) + seconds
+        if kind == 'dur':
+            minutes = int(match.group('minutes'))
+            seconds = int(match.group('seconds'))
+            current_track['duration_seconds'] = (minutes * 60) + seconds
         
         # Check for YouTube link
-        if current_track:
-            youtube_match = re.search(youtube_pattern, line)
-            if youtube_match:
-                current_track['youtube_url'] = youtube_match.group(1)
-                tracks.append(current_track)
-                current_track = None
+        elif kind == 'yt':
+            current_track['youtube_url'] = match.group('url')
+            tracks.append(current_track)
+            current_track = None
     
     return tracks
 
 
 def generate_m3u_from_tracks(tracks, playlist_name="Playlist"):
     """Generate M3U content from track list."""
-    m3u_content = "#EXTM3U\n"
-    m3u_content += f"#PLAYLIST:{playlist_name}\n"
-    m3u_content += "# Generated from markdown file with YouTube links\n"
-    m3u_content += f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n"
+    parts = ["#EXTM3U\n"]
+    parts.append(f"#PLAYLIST:{playlist_name}\n")
+    parts.append("# Generated from markdown file with YouTube links\n")
+    parts.append(f"# Generated on {datetime.now().strftime('%B %d, %Y')}\n\n")
     
     youtube_count = 0
     
     for track in tracks:
         if track['youtube_url']:
             # Add extended info line
-            m3u_content += f"#EXTINF:{track['duration_seconds']},{track['artist']} - {track['name']}\n"
-            m3u_content += f"{track['youtube_url']}\n\n"
+            parts.append(f"#EXTINF:{track['duration_seconds']},{track['artist']} - {track['name']}\n")
+            parts.append(f"{track['youtube_url']}\n\n")
             youtube_count += 1
         else:
             # Add as comment if no YouTube link found
-            m3u_content += f"# Track {track['number']}: {track['artist']} - {track['name']} (No YouTube link found)\n\n"
+            parts.append(f"# Track {track['number']}: {track['artist']} - {track['name']} (No YouTube link found)\n\n")
     
     print(f"Added {youtube_count} YouTube tracks to M3U playlist")
     
-    return m3u_content
+    return "".join(parts)
 
 
 def extract_playlist_name_from_markdown(markdown_content):
     """Extract playlist name from markdown header."""
     # Look for the first h1 header
-    header_match = re.search(r'^#\s+(.+?)$', markdown_content, re.MULTILINE)
+    header_match = _HEADER_RE.search(markdown_content)
     if header_match:
         # Clean up the playlist name
         name = header_match.group(1)
         # Remove emoji and special characters, keep basic punctuation
-        name = re.sub(r'[^\w\s\-\(\)&\.,]', '', name).strip()
+        name = _NAME_CLEANUP_RE.sub('', name).strip()
         return name
     return "Playlist"
 
@@ -137,13 +141,13 @@ def process_markdown_file(markdown_file_path, output_dir=None):
             output_dir = Path(markdown_file_path).parent
         
         # Create safe filename
-        safe_name = re.sub(r'[^\w\s\-]', '', playlist_name).strip()
-        safe_name = re.sub(r'[-\s]+', '-', safe_name)
-        output_file = Path(output_dir) / f"{safe_name}-youtube.m3u"
+        safe_name = make_safe_name(playlist_name)
+        filename = f"{safe_name}-youtube.m3u"
+        output_file = Path(output_dir) / filename
         
         # Save M3U file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(m3u_content)
+        if not save_file(m3u_content, filename, output_dir):
+            return False
         
         print(f"✅ Generated: {output_file}")
         return True
@@ -157,21 +161,22 @@ def process_directory(directory_path, output_dir=None):
     """Process all markdown files in a directory."""
     directory = Path(directory_path)
     
-    # Find all markdown files
-    markdown_files = list(directory.glob("*.md")) + list(directory.glob("**/*.md"))
-    
-    if not markdown_files:
-        print(f"No markdown files found in {directory_path}")
-        return 0
-    
-    print(f"Found {len(markdown_files)} markdown files")
-    
+    # Process markdown files as the directory walk finds them; rglob visits
+    # each file once, so no list of paths is built up front
+    total_count = 0
     success_count = 0
-    for md_file in markdown_files:
+    for md_file in directory.rglob("*.md"):
+        total_count += 1
         if process_markdown_file(md_file, output_dir):
             success_count += 1
         print()  # Add blank line between files
     
+    if total_count == 0:
+        print(f"No markdown files found in {directory_path}")
+        return 0
+    
+    print(f"Processed {total_count} markdown files")
+    
     return success_count
 
 
@@ -0,0 +1,80 @@
+"""
+Shared helpers for Spotify Playlist Creator.
+
+File naming and writing helpers used by both the Spotify converter and the
+markdown to M3U converter.
+"""
+
+import os
+import re
+
+# Characters dropped from file names
+_UNSAFE_CHARS_RE = re.compile(r"[^\w\s-]")
+
+# Runs of spaces and dashes, collapsed to a single dash
+_SEPARATOR_RE = re.compile(r"[-\s]+")
+
+# Output directories already created by save_file during this run
+_ENSURED_DIRS: set[str] = set()
+
+
+def make_safe_name(name: str) -> str:
+    """
+    Turn a playlist name into a file-name-safe slug.
+
+    Args:
+        name: Playlist name
+
+    Returns:
+        str: Name with punctuation dropped and each run of spaces and dashes
+        replaced by a single dash
+    """
+    return _SEPARATOR_RE.sub("-", _UNSAFE_CHARS_RE.sub("", name).strip())
+
+
+def _ensure_dir(output_dir: str) -> None:
+    """Create an output directory unless this run already has."""
+    if output_dir not in _ENSURED_DIRS:
+        os.makedirs(output_dir, exist_ok=True)
+        _ENSURED_DIRS.add(output_dir)
+
+
+def save_file(content: str, filename: str, output_dir="output") -> bool:
+    """
+    Save content to a file, creating the output directory if needed.
+
+    Args:
+        content: Text to write, encoded as UTF-8
+        filename: Name of the file inside output_dir
+        output_dir: Directory to write into
+
+    Returns:
+        bool: True if the file was written
+    """
+    output_dir = os.fspath(output_dir)
+    file_path = os.path.join(output_dir, filename)
+    tmp_path = f"{file_path}.tmp"
+
+    try:
+        data = content.encode("utf-8")
+        _ensure_dir(output_dir)
+
+        # Write the whole file in one call, then swap it into place so
+        # readers never see a partially written file
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        except FileNotFoundError:
+            # The directory was removed after this run created it
+            _ENSURED_DIRS.discard(output_dir)
+            _ensure_dir(output_dir)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        os.replace(tmp_path, file_path)
+        print(f"File saved: {file_path}")
+        return True
+    except Exception as e:
+        print(f"Error saving file {file_path}: {e}")
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
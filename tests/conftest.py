@@ -0,0 +1,16 @@
+"""Shared pytest fixtures."""
+
+import importlib
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def pc_main():
+    """
+    Import playlist_creator.main once per session.
+
+    The module pulls in spotipy and requests, so importing it here instead of
+    at test-module level keeps collection fast.
+    """
+    return importlib.import_module("playlist_creator.main")
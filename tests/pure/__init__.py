@@ -0,0 +1 @@
+# Empty file to make tests/pure a Python package
@@ -0,0 +1,48 @@
+"""
+Cross-session memo of verified extract_playlist_id results.
+
+Results are stored in pytest's cache (.pytest_cache/v/playlist_creator/) and
+keyed by a checksum of the module source, so any edit to the module discards
+them and every URL is checked again.
+"""
+
+import hashlib
+from functools import cache
+from pathlib import Path
+
+CACHE_KEY = "playlist_creator/playlist_ids"
+
+
+@cache
+def _source_digest(path):
+    """Return the SHA-1 of a module's source file."""
+    return hashlib.sha1(Path(path).read_bytes()).hexdigest()
+
+
+def cached_assert(config, module, url, expected):
+    """
+    Assert that module.extract_playlist_id(url) == expected.
+
+    The call is skipped when the same URL and expectation already passed
+    against identical module source in an earlier session. Without the
+    cacheprovider plugin this is a plain assertion.
+    """
+    cache = getattr(config, "cache", None)
+    if cache is None:
+        assert module.extract_playlist_id(url) == expected
+        return
+
+    digest = _source_digest(module.__file__)
+    url_key = hashlib.sha1(url.encode()).hexdigest()
+
+    entry = cache.get(CACHE_KEY, None)
+    if not entry or entry.get("source") != digest:
+        entry = {"source": digest, "verified": {}}
+
+    verified = entry["verified"]
+    if url_key in verified and verified[url_key] == expected:
+        return
+
+    assert module.extract_playlist_id(url) == expected
+    verified[url_key] = expected
+    cache.set(CACHE_KEY, entry)
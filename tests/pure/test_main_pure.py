@@ -0,0 +1,75 @@
+"""Basic tests for the main module."""
+
+from functools import cache
+
+import pytest
+
+from ._id_cache import cached_assert
+
+
+@cache
+def _memoized(func):
+    """
+    Wrap a pure function from the module under test in a cache, once
+    per function, so repeated inputs (pytest-repeat, expanded matrices) are
+    computed only once per session.
+    """
+    return cache(func)
+
+
+@pytest.mark.parametrize(
+    "url,expected",
+    [
+        # Standard Spotify URL
+        ("https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M", "37i9dQZF1DXcBWIGoYBM5M"),
+        # Spotify URI
+        ("spotify:playlist:37i9dQZF1DXcBWIGoYBM5M", "37i9dQZF1DXcBWIGoYBM5M"),
+        # Just the ID
+        ("37i9dQZF1DXcBWIGoYBM5M", "37i9dQZF1DXcBWIGoYBM5M"),
+        # Invalid URL
+        ("https://example.com/invalid", None),
+    ],
+)
+def test_extract_playlist_id(pytestconfig, pc_main, url, expected):
+    """Test playlist ID extraction from various URL formats."""
+    cached_assert(pytestconfig, pc_main, url, expected)
+
+
+@pytest.mark.parametrize(
+    "duration_ms,expected",
+    [
+        (60000, "1:00"),  # 1 minute
+        (125000, "2:05"),  # 2 minutes 5 seconds
+        (30000, "0:30"),  # 30 seconds
+    ],
+)
+def test_format_duration(pc_main, duration_ms, expected):
+    """Test duration formatting."""
+    assert _memoized(pc_main.format_duration)(duration_ms) == expected
+
+
+def test_clean_text(pc_main):
+    """Test text cleaning for markdown."""
+    cases = [
+        ("Normal text", "Normal text"),
+        ("Text with *asterisk*", "Text with \\*asterisk\\*"),
+        ("Text with [brackets]", "Text with \\[brackets\\]"),
+        ("_`()#+-.!", "\\_\\`\\(\\)\\#\\+\\-\\.\\!"),
+        (None, ""),
+    ]
+    inputs, expected = zip(*cases, strict=True)
+    assert list(map(_memoized(pc_main.clean_text), inputs)) == list(expected)
+
+
+@pytest.mark.parametrize(
+    "name,expected",
+    [
+        ("My Playlist", "My-Playlist"),
+        ("Rock & Roll!", "Rock-Roll"),
+        ("  a - b  ", "a-b"),
+        ("-Intro", "-Intro"),
+    ],
+)
+def test_make_safe_name(pc_main, name, expected):
+    """Test file name generation from playlist names."""
+    assert _memoized(pc_main.make_safe_name)(name) == expected
@@ -28,6 +28,7 @@ def test_get_spotify_credentials_no_env():
     if "SPOTIFY_CLIENT_SECRET" in os.environ:
         del os.environ["SPOTIFY_CLIENT_SECRET"]
 
+    get_spotify_credentials.cache_clear()
     try:
         client_id, client_secret = get_spotify_credentials()
         assert client_id is None
@@ -38,6 +39,7 @@ def test_get_spotify_credentials_no_env():
             os.environ["SPOTIFY_CLIENT_ID"] = old_id
         if old_secret:
             os.environ["SPOTIFY_CLIENT_SECRET"] = old_secret
+        get_spotify_credentials.cache_clear()
 
 
 def test_get_spotify_credentials_with_env():
@@ -45,6 +47,7 @@ def test_get_spotify_credentials_with_env():
     os.environ["SPOTIFY_CLIENT_ID"] = "test_id"
     os.environ["SPOTIFY_CLIENT_SECRET"] = "test_secret"
 
+    get_spotify_credentials.cache_clear()
     try:
         client_id, client_secret = get_spotify_credentials()
         assert client_id == "test_id"
@@ -53,3 +56,4 @@ def test_get_spotify_credentials_with_env():
         # Clean up
         del os.environ["SPOTIFY_CLIENT_ID"]
         del os.environ["SPOTIFY_CLIENT_SECRET"]
+        get_spotify_credentials.cache_clear()
@@ -1,37 +1,411 @@
-"""Basic tests for the main module."""
+"""Tests for the main module's Spotify paging, YouTube search and caching helpers."""
 
-from playlist_creator.main import clean_text, extract_playlist_id, format_duration
+import json
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from itertools import pairwise
 
 
-def test_extract_playlist_id():
-    """Test playlist ID extraction from various URL formats."""
-    # Standard Spotify URL
-    url1 = "https://open.spotify.com/playlist/37i9dQZF1DXcBWIGoYBM5M"
-    assert extract_playlist_id(url1) == "37i9dQZF1DXcBWIGoYBM5M"
+class FakeStreamResponse:
+    """Streamed response stand-in that yields its body in fixed chunks."""
 
-    # Spotify URI
-    url2 = "spotify:playlist:37i9dQZF1DXcBWIGoYBM5M"
-    assert extract_playlist_id(url2) == "37i9dQZF1DXcBWIGoYBM5M"
+    def __init__(self, body, chunk_size, encoding="utf-8"):
+        self.body = body
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.chunks_read = 0
 
-    # Just the ID
-    url3 = "37i9dQZF1DXcBWIGoYBM5M"
-    assert extract_playlist_id(url3) == "37i9dQZF1DXcBWIGoYBM5M"
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        assert decode_unicode and self.encoding is not None
+        for start in range(0, len(self.body), self.chunk_size):
+            self.chunks_read += 1
+            yield self.body[start : start + self.chunk_size]
 
-    # Invalid URL
-    url4 = "https://example.com/invalid"
-    assert extract_playlist_id(url4) is None
 
+def test_find_first_video_id_across_chunks(pc_main):
+    """Test that a videoId token split across chunk boundaries is found."""
+    token = '"videoId":"abcDEF123_-"'
+    body = "x" * 40 + token + '"videoId":"zzzzzzzzzzz"' + "y" * 200
 
-def test_format_duration():
-    """Test duration formatting."""
-    assert format_duration(60000) == "1:00"  # 1 minute
-    assert format_duration(125000) == "2:05"  # 2 minutes 5 seconds
-    assert format_duration(30000) == "0:30"  # 30 seconds
+    # Split the token at every position, including between chunks
+    for offset in range(len(token) + 1):
+        response = FakeStreamResponse("p" * offset + body, chunk_size=16)
+        assert pc_main._find_first_video_id(response) == "abcDEF123_-"
 
+    # Scanning stops at the chunk holding the match
+    response = FakeStreamResponse(body, chunk_size=16)
+    pc_main._find_first_video_id(response)
+    assert response.chunks_read < len(body) // 16
 
-def test_clean_text():
-    """Test text cleaning for markdown."""
-    assert clean_text("Normal text") == "Normal text"
-    assert clean_text("Text with *asterisk*") == "Text with \\*asterisk\\*"
-    assert clean_text("Text with [brackets]") == "Text with \\[brackets\\]"
-    assert clean_text(None) == ""
+
+def test_find_first_video_id_without_encoding(pc_main):
+    """Test that a response without a declared encoding is decoded as UTF-8."""
+    response = FakeStreamResponse('<html>"videoId":"abcdefghijk"', 8, encoding=None)
+    assert pc_main._find_first_video_id(response) == "abcdefghijk"
+    assert response.encoding == "utf-8"
+
+
+def test_find_first_video_id_no_match(pc_main):
+    """Test that a page without video IDs returns None."""
+    response = FakeStreamResponse("no results here" * 10, chunk_size=7)
+    assert pc_main._find_first_video_id(response) is None
+
+
+def _fake_search(calls, found):
+    """Build a search_youtube_many stand-in recording the queries it gets."""
+
+    def search_many(queries):
+        calls.append(list(queries))
+        return [
+            f"https://www.youtube.com/watch?v={found[q]}"
+            if q in found
+            else f"https://www.youtube.com/results?search_query={q}"
+            for q in queries
+        ]
+
+    return search_many
+
+
+def test_find_youtube_urls_cache_hit_skips_search(pc_main, tmp_path, monkeypatch):
+    """Test that tracks already in the persistent cache are not searched."""
+    cache_path = tmp_path / ".yt_cache.json"
+    cache_path.write_text(
+        json.dumps({"id1": "https://www.youtube.com/watch?v=cachedvideo"})
+    )
+    monkeypatch.setattr(pc_main, "YOUTUBE_CACHE_PATH", cache_path)
+    calls = []
+    monkeypatch.setattr(
+        pc_main, "search_youtube_many", _fake_search(calls, {"B b": "newvideo123"})
+    )
+
+    tracks = [{"id": "id1"}, {"id": "id2"}]
+    urls = pc_main.find_youtube_urls(tracks, ["A a", "B b"])
+
+    assert urls == [
+        "https://www.youtube.com/watch?v=cachedvideo",
+        "https://www.youtube.com/watch?v=newvideo123",
+    ]
+    assert calls == [["B b"]]
+
+    # A second run is served entirely from the cache
+    calls.clear()
+    assert pc_main.find_youtube_urls(tracks, ["A a", "B b"]) == urls
+    assert calls == []
+
+
+def test_find_youtube_urls_saves_only_video_urls(pc_main, tmp_path, monkeypatch):
+    """Test that search-page fallbacks are not written to the cache."""
+    cache_path = tmp_path / "output" / ".yt_cache.json"
+    monkeypatch.setattr(pc_main, "YOUTUBE_CACHE_PATH", cache_path)
+    monkeypatch.setattr(
+        pc_main, "search_youtube_many", _fake_search([], {"A a": "foundvideo1"})
+    )
+
+    urls = pc_main.find_youtube_urls([{"id": "id1"}, {"id": "id2"}], ["A a", "B b"])
+
+    assert "watch?v=" not in urls[1]
+    assert json.loads(cache_path.read_text()) == {
+        "id1": "https://www.youtube.com/watch?v=foundvideo1"
+    }
+    assert not cache_path.with_name(cache_path.name + ".tmp").exists()
+
+
+def test_find_youtube_urls_overwrites_corrupt_cache(pc_main, tmp_path, monkeypatch):
+    """Test that an unreadable cache file is ignored and then replaced."""
+    cache_path = tmp_path / ".yt_cache.json"
+    cache_path.write_text("{not json")
+    monkeypatch.setattr(pc_main, "YOUTUBE_CACHE_PATH", cache_path)
+    calls = []
+    monkeypatch.setattr(
+        pc_main, "search_youtube_many", _fake_search(calls, {"A a": "foundvideo1"})
+    )
+
+    urls = pc_main.find_youtube_urls([{"id": "id1"}], ["A a"])
+
+    assert urls == ["https://www.youtube.com/watch?v=foundvideo1"]
+    assert calls == [["A a"]]
+    assert json.loads(cache_path.read_text()) == {"id1": urls[0]}
+
+
+def test_find_youtube_urls_keys_by_query_without_id(pc_main, tmp_path, monkeypatch):
+    """Test that tracks without a Spotify ID are cached by search query."""
+    cache_path = tmp_path / ".yt_cache.json"
+    monkeypatch.setattr(pc_main, "YOUTUBE_CACHE_PATH", cache_path)
+    monkeypatch.setattr(
+        pc_main, "search_youtube_many", _fake_search([], {"Local song": "localvideo1"})
+    )
+
+    pc_main.find_youtube_urls([{"id": None}], ["Local song"])
+
+    assert json.loads(cache_path.read_text()) == {
+        "Local song": "https://www.youtube.com/watch?v=localvideo1"
+    }
+
+
+@contextmanager
+def _local_server(handler):
+    """Serve a request handler class on a free local port for the test's duration."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    )
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _search_page_handler(body, connections):
+    """Build a handler serving a fixed search page and recording connections."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            connections.append(self.client_address)
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+def _use_local_youtube(pc_main, monkeypatch, base):
+    """Point search_youtube at a local server with no cache or rate limit."""
+    monkeypatch.setattr(pc_main, "_YT_SEARCH_BASE", f"{base}/results?search_query=")
+    monkeypatch.setattr(pc_main, "_video_url_cache", {})
+    monkeypatch.setattr(pc_main, "_youtube_rate_limiter", pc_main.RateLimiter(1e9))
+
+
+def test_rate_limiter_spaces_threads(pc_main, monkeypatch):
+    """Test that concurrent acquires are given start times 1/rate apart."""
+    clock = {"now": 100.0}
+    local = threading.local()
+
+    def fake_sleep(seconds):
+        local.slept = seconds
+
+    monkeypatch.setattr(pc_main.time, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(pc_main.time, "sleep", fake_sleep)
+
+    limiter = pc_main.RateLimiter(4)
+    barrier = threading.Barrier(8)
+    starts = []
+    lock = threading.Lock()
+
+    def worker():
+        local.slept = 0.0
+        barrier.wait()
+        limiter.acquire()
+        with lock:
+            starts.append(clock["now"] + local.slept)
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    starts.sort()
+    assert starts[0] == 100.0
+    assert all(b - a >= 0.25 for a, b in pairwise(starts))
+
+    # Once the reserved slots have passed, acquire does not wait at all
+    clock["now"] = 200.0
+    local.slept = 0.0
+    limiter.acquire()
+    assert local.slept == 0.0
+
+
+def test_search_youtube_reuses_connection(pc_main, monkeypatch):
+    """Test that consecutive searches share one keep-alive connection."""
+    connections = []
+    body = ('"videoId":"abcdefghijk"' + "x" * 200_000).encode()
+
+    with _local_server(_search_page_handler(body, connections)) as base:
+        _use_local_youtube(pc_main, monkeypatch, base)
+        for n in range(5):
+            url = pc_main.search_youtube(f"song {n}")
+            assert url == "https://www.youtube.com/watch?v=abcdefghijk"
+
+    assert len(connections) == 1
+
+
+def test_search_youtube_no_video_id(pc_main, monkeypatch):
+    """Test that a page without video IDs falls back to the search URL cleanly."""
+    connections = []
+    body = ("no results here " * 5000).encode()
+    errors = []
+    real_get = pc_main._SESSION.get
+
+    def recording_get(*args, **kwargs):
+        response = real_get(*args, **kwargs)
+        real_iter = response.iter_content
+
+        def iter_content(*iter_args, **iter_kwargs):
+            try:
+                yield from real_iter(*iter_args, **iter_kwargs)
+            except Exception as e:
+                errors.append(e)
+                raise
+
+        response.iter_content = iter_content
+        return response
+
+    with _local_server(_search_page_handler(body, connections)) as base:
+        _use_local_youtube(pc_main, monkeypatch, base)
+        monkeypatch.setattr(pc_main._SESSION, "get", recording_get)
+        url = pc_main.search_youtube("missing song")
+
+    assert url == f"{base}/results?search_query=missing+song"
+    assert errors == []
+    assert pc_main._video_url_cache == {}
+
+
+def _spotify_tracks_handler(total, requests_seen, status=200, delays=None, done=None):
+    """
+    Build a handler serving a playlist's track pages and recording requests.
+
+    delays maps an offset to seconds to wait before answering; done records
+    offsets in the order their responses were sent.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            params = urllib.parse.parse_qs(url.query)
+            offset = int(params["offset"][0])
+            limit = int(params["limit"][0])
+            requests_seen.append((url.path, offset, self.headers["Authorization"]))
+            time.sleep((delays or {}).get(offset, 0))
+
+            end = min(offset + limit, total)
+            page = {
+                "items": [{"track": {"id": f"t{i}"}} for i in range(offset, end)],
+                "total": total,
+            }
+            body = json.dumps(page).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+            if done is not None:
+                done.append(offset)
+
+        def log_message(self, *args):
+            pass
+
+    return Handler
+
+
+class FakeSpotify:
+    """Spotify client stand-in that only knows the playlist metadata call."""
+
+    def playlist(self, playlist_id):
+        return {"id": playlist_id, "name": "Test"}
+
+
+def test_setup_spotify_client_returns_token(pc_main, monkeypatch):
+    """Test that the client comes back together with a bearer token."""
+
+    class FakeCredentials:
+        def __init__(self, client_id, client_secret):
+            pass
+
+        def get_access_token(self, as_dict=True):
+            assert as_dict is False
+            return "tok"
+
+    monkeypatch.setattr(pc_main, "SpotifyClientCredentials", FakeCredentials)
+    sp, token = pc_main.setup_spotify_client("id", "secret")
+
+    assert isinstance(sp, pc_main.spotipy.Spotify)
+    assert token == "tok"
+
+
+def test_get_playlist_data_uses_bearer_token(pc_main, monkeypatch):
+    """Test that track pages are fetched with the bearer token."""
+    requests_seen = []
+
+    with _local_server(_spotify_tracks_handler(150, requests_seen)) as base:
+        monkeypatch.setattr(pc_main, "SPOTIFY_API_BASE", base)
+        playlist, tracks = pc_main.get_playlist_data(FakeSpotify(), "p1", "tok")
+
+    assert playlist == {"id": "p1", "name": "Test"}
+    assert [item["track"]["id"] for item in tracks] == [f"t{i}" for i in range(150)]
+    assert {path for path, _, _ in requests_seen} == {"/playlists/p1/tracks"}
+    assert {auth for _, _, auth in requests_seen} == {"Bearer tok"}
+
+
+def test_get_playlist_data_pages_in_offset_order(pc_main, monkeypatch):
+    """Test that pages finishing out of order are still joined in offset order."""
+    requests_seen = []
+    done = []
+    # Later pages answer first, so completion order is the reverse of offsets
+    delays = {100: 0.15, 200: 0.1, 300: 0.05}
+    handler = _spotify_tracks_handler(350, requests_seen, delays=delays, done=done)
+
+    with _local_server(handler) as base:
+        monkeypatch.setattr(pc_main, "SPOTIFY_API_BASE", base)
+        _, tracks = pc_main.get_playlist_data(FakeSpotify(), "p1", "tok")
+
+    assert done[0] == 0 and done[1:] == [300, 200, 100]
+    assert [item["track"]["id"] for item in tracks] == [f"t{i}" for i in range(350)]
+
+
+def test_get_playlist_data_page_count_follows_total(pc_main, monkeypatch):
+    """Test that the first page's total decides which further pages are fetched."""
+    cases = {0: [0], 100: [0], 101: [0, 100], 350: [0, 100, 200, 300]}
+    for total, expected_offsets in cases.items():
+        requests_seen = []
+        with _local_server(_spotify_tracks_handler(total, requests_seen)) as base:
+            monkeypatch.setattr(pc_main, "SPOTIFY_API_BASE", base)
+            _, tracks = pc_main.get_playlist_data(FakeSpotify(), "p1", "tok")
+
+        assert sorted(offset for _, offset, _ in requests_seen) == expected_offsets
+        assert len(tracks) == total
+
+
+def test_get_playlist_data_http_error(pc_main, monkeypatch, capsys):
+    """Test that a failed track page request is reported and returns nothing."""
+    handler = _spotify_tracks_handler(150, [], status=404)
+
+    with _local_server(handler) as base:
+        monkeypatch.setattr(pc_main, "SPOTIFY_API_BASE", base)
+        result = pc_main.get_playlist_data(FakeSpotify(), "p1", "tok")
+
+    assert result == (None, None)
+    assert "Spotify API error" in capsys.readouterr().out
+
+
+def test_search_youtube_many_dedupes_queries(pc_main, monkeypatch):
+    """Test that repeated queries are searched once and results keep input order."""
+    calls = []
+
+    def fake_search(query):
+        calls.append(query)
+        return f"https://www.youtube.com/results?search_query={query}"
+
+    monkeypatch.setattr(pc_main, "search_youtube", fake_search)
+    queries = ["A a", "B b", "A a", "C c", "B b", "A a"]
+
+    urls = pc_main.search_youtube_many(queries)
+
+    assert sorted(calls) == ["A a", "B b", "C c"]
+    assert urls == [f"https://www.youtube.com/results?search_query={q}" for q in queries]
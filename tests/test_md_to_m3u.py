@@ -0,0 +1,106 @@
+"""Tests for the markdown to M3U converter."""
+
+import re
+
+from playlist_creator.md_to_m3u import extract_youtube_links_from_markdown
+
+
+def _track(track_id, name, artists, duration_ms):
+    """Build a Spotify playlist item."""
+    return {
+        "track": {
+            "id": track_id,
+            "name": name,
+            "artists": [{"name": artist} for artist in artists],
+            "album": {"name": "Album (Deluxe) [2020]"},
+            "duration_ms": duration_ms,
+            "external_urls": {"spotify": f"https://open.spotify.com/track/{track_id}"},
+        }
+    }
+
+
+def _legacy_extract(markdown_content):
+    """The original line-by-line parser, kept as a reference implementation."""
+    track_pattern = r"(\d+)\.\s*\*\*(.+?)\*\*\s*by\s*(.+?)(?:\n|$)"
+    youtube_pattern = r"\[.*?Listen on YouTube.*?\]\((https://www\.youtube\.com/watch\?v=[\w-]+)\)"
+    duration_pattern = r"Duration:\s*(\d+):(\d+)"
+
+    tracks = []
+    current_track = None
+    for line in markdown_content.split("\n"):
+        track_match = re.search(track_pattern, line)
+        if track_match:
+            current_track = {
+                "number": int(track_match.group(1)),
+                "name": track_match.group(2).replace("\\", ""),
+                "artist": track_match.group(3).replace("\\", ""),
+                "duration_seconds": 0,
+                "youtube_url": None,
+            }
+            continue
+        if current_track:
+            duration_match = re.search(duration_pattern, line)
+            if duration_match:
+                current_track["duration_seconds"] = int(
+                    duration_match.group(1)
+                ) * 60 + int(duration_match.group(2))
+        if current_track:
+            youtube_match = re.search(youtube_pattern, line)
+            if youtube_match:
+                current_track["youtube_url"] = youtube_match.group(1)
+                tracks.append(current_track)
+                current_track = None
+    return tracks
+
+
+def test_extract_youtube_links_from_generated_markdown(monkeypatch, pc_main):
+    """Test parsing markdown produced by generate_markdown."""
+    tracks = [
+        _track("t1", "Song (Remix) *Live*", ["A.B.", "C-D"], 185000),
+        {"track": None},  # Unavailable track
+        _track("t2", "Spotify Only!", ["E_F"], 61000),
+        _track("t3", "[Intro] #1 + more", ["G"], 7000),
+    ]
+    playlist = {
+        "name": "Test #1",
+        "description": "",
+        "owner": {"display_name": "tester"},
+        "tracks": {"total": len(tracks)},
+        "external_urls": {"spotify": "https://open.spotify.com/playlist/p1"},
+    }
+    found = {
+        "t1": "https://www.youtube.com/watch?v=abc-_123456",
+        "t3": "https://www.youtube.com/watch?v=zyx987-_654",
+    }
+
+    def fake_find(available, queries):
+        return [
+            found.get(track["id"], f"https://www.youtube.com/results?search_query={q}")
+            for track, q in zip(available, queries, strict=True)
+        ]
+
+    monkeypatch.setattr(pc_main, "find_youtube_urls", fake_find)
+    markdown = pc_main.generate_markdown(playlist, tracks)
+
+    expected = [
+        {
+            "number": 1,
+            "name": "Song (Remix) *Live*",
+            "artist": "A.B., C-D",
+            "duration_seconds": 185,
+            "youtube_url": found["t1"],
+        },
+        {
+            "number": 4,
+            "name": "[Intro] #1 + more",
+            "artist": "G",
+            "duration_seconds": 7,
+            "youtube_url": found["t3"],
+        },
+    ]
+    assert extract_youtube_links_from_markdown(markdown) == expected
+    assert _legacy_extract(markdown) == expected
+
+    # The single-scan parser matches the line-by-line one on CRLF input too
+    crlf = markdown.replace("\n", "\r\n")
+    assert extract_youtube_links_from_markdown(crlf) == _legacy_extract(crlf)
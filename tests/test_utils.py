@@ -0,0 +1,25 @@
+"""Tests for the shared file helpers."""
+
+import shutil
+
+from playlist_creator.utils import save_file
+
+
+def test_save_file_recreates_removed_directory(tmp_path):
+    """Test that a directory deleted mid-run is created again on the next save."""
+    output_dir = tmp_path / "output"
+
+    assert save_file("first", "a.md", output_dir) is True
+    shutil.rmtree(output_dir)
+    assert save_file("second", "b.md", output_dir) is True
+
+    assert (output_dir / "b.md").read_text(encoding="utf-8") == "second"
+    assert not (output_dir / "b.md.tmp").exists()
+
+
+def test_save_file_unencodable_content(tmp_path):
+    """Test that content that cannot be encoded is reported, not raised."""
+    output_dir = tmp_path / "output"
+
+    assert save_file("\ud800", "x.md", output_dir) is False
+    assert not (output_dir / "x.md").exists()